@@ -6,18 +6,32 @@ Context files contain system prompts with security hardening against
 prompt injection and social engineering attacks.
 """
 
+import orjson
 from pathlib import Path
-from functools import lru_cache
 
 
 # Base directory for agents
 AGENTS_DIR = Path(__file__).resolve().parent
 
+# Context file of each agent
+CONTEXT_PATHS = {
+    "manager": AGENTS_DIR / "manager" / "context_manager.txt",
+    "moderator": AGENTS_DIR / "narrative" / "context_moderator.txt",
+    "writer": AGENTS_DIR / "narrative" / "context_writer.txt",
+    "translator": AGENTS_DIR / "translator" / "context_translator.txt",
+}
+
+# Loaded contexts keyed on (agent_name, file mtime) so edits are picked up
+_CTX_CACHE: dict[tuple[str, int], str] = {}
+
+# Single-pass escaping of XML-like tags in untrusted text
+_XML_ESCAPE = str.maketrans({"<": "&lt;", ">": "&gt;"})
+
 
-@lru_cache(maxsize=10)
 def load_context(agent_name: str) -> str:
     """
     Load context file for a specific agent.
+    Cached until the file's modification time changes.
     
     Args:
         agent_name: Name of the agent (manager, moderator, writer, translator)
@@ -28,22 +42,27 @@ def load_context(agent_name: str) -> str:
     Raises:
         FileNotFoundError: If context file doesn't exist
     """
-    context_paths = {
-        "manager": AGENTS_DIR / "manager" / "context_manager.txt",
-        "moderator": AGENTS_DIR / "narrative" / "context_moderator.txt",
-        "writer": AGENTS_DIR / "narrative" / "context_writer.txt",
-        "translator": AGENTS_DIR / "translator" / "context_translator.txt",
-    }
+    if agent_name not in CONTEXT_PATHS:
+        raise ValueError(f"Unknown agent: {agent_name}. Available: {list(CONTEXT_PATHS.keys())}")
     
-    if agent_name not in context_paths:
-        raise ValueError(f"Unknown agent: {agent_name}. Available: {list(context_paths.keys())}")
+    context_path = CONTEXT_PATHS[agent_name]
     
-    context_path = context_paths[agent_name]
-    
-    if not context_path.exists():
+    try:
+        mtime = context_path.stat().st_mtime_ns
+    except FileNotFoundError:
         raise FileNotFoundError(f"Context file not found: {context_path}")
     
-    return context_path.read_text(encoding="utf-8")
+    key = (agent_name, mtime)
+    hit = _CTX_CACHE.get(key)
+    if hit is not None:
+        return hit
+    
+    text = context_path.read_bytes().decode("utf-8")
+    # Drop the entry of a previous version of this file
+    for stale in [k for k in _CTX_CACHE if k[0] == agent_name]:
+        del _CTX_CACHE[stale]
+    _CTX_CACHE[key] = text
+    return text
 
 
 def wrap_user_input(user_input: str) -> str:
@@ -58,30 +77,51 @@ def wrap_user_input(user_input: str) -> str:
         Wrapped input with XML tags
     """
     # Escape any existing XML-like tags in user input to prevent injection
-    sanitized = user_input.replace("<", "&lt;").replace(">", "&gt;")
+    sanitized = user_input.translate(_XML_ESCAPE)
     return f"<user_input>\n{sanitized}\n</user_input>"
 
 
-def wrap_content_for_moderation(content: str, context: dict) -> tuple[str, str]:
+def wrap_content_to_verify(content: str) -> str:
     """
-    Wrap content and context for moderator agent.
+    Wrap one text to moderate for moderator agent.
     
     Args:
         content: Text content to moderate
-        context: Story context dictionary
     
     Returns:
-        Tuple of (wrapped_content, wrapped_context)
+        Wrapped content with XML tags
     """
-    sanitized_content = content.replace("<", "&lt;").replace(">", "&gt;")
+    sanitized_content = content.translate(_XML_ESCAPE)
+    return f"<content_to_verify>\n{sanitized_content}\n</content_to_verify>"
+
+
+def wrap_story_context(context: dict) -> str:
+    """
+    Wrap the story context for moderator agent.
     
+    Args:
+        context: Story context dictionary
+    
+    Returns:
+        Wrapped context with XML tags
+    """
     # Convert context dict to safe string representation
-    context_str = str(context).replace("<", "&lt;").replace(">", "&gt;")
+    context_str = orjson.dumps(context).decode().translate(_XML_ESCAPE)
+    return f"<story_context>\n{context_str}\n</story_context>"
+
+
+def wrap_content_for_moderation(content: str, context: dict) -> tuple[str, str]:
+    """
+    Wrap content and context for moderator agent.
     
-    wrapped_content = f"<content_to_verify>\n{sanitized_content}\n</content_to_verify>"
-    wrapped_context = f"<story_context>\n{context_str}\n</story_context>"
+    Args:
+        content: Text content to moderate
+        context: Story context dictionary
     
-    return wrapped_content, wrapped_context
+    Returns:
+        Tuple of (wrapped_content, wrapped_context)
+    """
+    return wrap_content_to_verify(content), wrap_story_context(context)
 
 
 def wrap_chapter_instructions(instructions: str, context: str) -> tuple[str, str]:
@@ -95,8 +135,8 @@ def wrap_chapter_instructions(instructions: str, context: str) -> tuple[str, str
     Returns:
         Tuple of (wrapped_instructions, wrapped_context)
     """
-    sanitized_inst = instructions.replace("<", "&lt;").replace(">", "&gt;")
-    sanitized_ctx = context.replace("<", "&lt;").replace(">", "&gt;")
+    sanitized_inst = instructions.translate(_XML_ESCAPE)
+    sanitized_ctx = context.translate(_XML_ESCAPE)
     
     wrapped_inst = f"<chapter_instructions>\n{sanitized_inst}\n</chapter_instructions>"
     wrapped_ctx = f"<story_context>\n{sanitized_ctx}\n</story_context>"
@@ -115,8 +155,8 @@ def wrap_translation_input(source_text: str, target_language: str) -> tuple[str,
     Returns:
         Tuple of (wrapped_source, wrapped_language)
     """
-    sanitized_text = source_text.replace("<", "&lt;").replace(">", "&gt;")
-    sanitized_lang = target_language.replace("<", "&lt;").replace(">", "&gt;")
+    sanitized_text = source_text.translate(_XML_ESCAPE)
+    sanitized_lang = target_language.translate(_XML_ESCAPE)
     
     wrapped_source = f"<source_text>\n{sanitized_text}\n</source_text>"
     wrapped_lang = f"<target_language>{sanitized_lang}</target_language>"
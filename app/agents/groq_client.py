@@ -0,0 +1,39 @@
+"""
+Shared Groq client.
+One async client per process, on the app-wide pool from app.core.http, so
+every agent reuses the same HTTP connections instead of opening its own.
+"""
+from functools import lru_cache
+
+from groq import AsyncGroq
+from app.core.config import settings
+from app.core.http import get_async_http_client
+from app.core.logger import get_logger
+
+logger = get_logger("groq")
+
+# The SDK retries rate limits, 5xx and connection errors with jittered
+# backoff, honoring Retry-After; its default of 2 gives up too early under load
+MAX_RETRIES = 4
+
+
+@lru_cache(maxsize=1)
+def get_async_groq_client() -> AsyncGroq:
+    """Return the process-wide async Groq client (on the shared HTTP pool)."""
+    return AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        http_client=get_async_http_client(),
+        max_retries=MAX_RETRIES
+    )
+
+
+def log_cache_usage(agent: str, usage) -> None:
+    """
+    Log how many prompt tokens were served from Groq's prefix cache.
+    Static system prompts are kept byte-identical so repeated calls can hit it.
+    """
+    if usage is None:
+        return
+    details = usage.prompt_tokens_details
+    cached = details.cached_tokens if details else 0
+    logger.debug(f"{agent}: {cached}/{usage.prompt_tokens} prompt tokens cached")
@@ -0,0 +1,147 @@
+"""
+LLM Response Cache for Ether Stories Agents
+
+This module provides an in-process cache for LLM completions.
+Responses are keyed on (model, system prompt, user prompt) so identical
+requests return instantly instead of paying a full Groq round-trip.
+"""
+
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Callable, Optional
+
+
+# Default cache settings
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAXSIZE = 256
+
+
+class LLMCache:
+    """
+    Bounded LRU cache with per-entry expiry for LLM response texts.
+    """
+
+    def __init__(self, name: str, ttl: int = DEFAULT_TTL_SECONDS, maxsize: int = DEFAULT_MAXSIZE):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str) -> str:
+        """
+        Build the cache key for a completion request.
+
+        Args:
+            model: Model identifier
+            system: System prompt
+            prompt: User prompt
+
+        Returns:
+            MD5 hex digest of the request
+        """
+        digest = hashlib.md5()
+        for part in (model, system, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def llm_cached(
+    name: str,
+    ttl: int = DEFAULT_TTL_SECONDS,
+    maxsize: int = DEFAULT_MAXSIZE,
+    validate: Optional[Callable[[str], bool]] = None
+) -> Callable:
+    """
+    Decorator caching a completion function of signature
+    `func(model, system, prompt, **params) -> str`.
+    Both plain and `async def` functions are supported.
+
+    Only successful responses are stored; exceptions propagate uncached.
+    The underlying cache is exposed as `wrapper.cache`.
+
+    Args:
+        name: Cache name (used for debugging)
+        ttl: Entry lifetime in seconds
+        maxsize: Maximum number of cached responses
+        validate: Optional check of the response text; a response is only
+            stored if it returns True (an exception counts as False), so
+            output the caller cannot use is requested again next time
+    """
+    cache = LLMCache(name, ttl=ttl, maxsize=maxsize)
+
+    def accepts(response_text: str) -> bool:
+        if not response_text:
+            return False
+        if validate is None:
+            return True
+        try:
+            return bool(validate(response_text))
+        except Exception:
+            return False
+
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(model: str, system: str, prompt: str, **params) -> str:
+                key = cache.make_key(model, system, prompt)
+                hit = cache.get(key)
+                if hit is not None:
+                    return hit
+
+                response_text = await func(model, system, prompt, **params)
+                if accepts(response_text):
+                    cache.set(key, response_text)
+                return response_text
+        else:
+            @wraps(func)
+            def wrapper(model: str, system: str, prompt: str, **params) -> str:
+                key = cache.make_key(model, system, prompt)
+                hit = cache.get(key)
+                if hit is not None:
+                    return hit
+
+                response_text = func(model, system, prompt, **params)
+                if accepts(response_text):
+                    cache.set(key, response_text)
+                return response_text
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
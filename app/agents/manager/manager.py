@@ -1,18 +1,62 @@
-import os
-import json
-import re
+import orjson
 import math
-from typing import List, Optional, Dict, Any
-from groq import Groq
-from app.core.config import settings
-from app.agents.context_loader import load_context, wrap_user_input, get_user_friendly_error
+from typing import Dict, Any
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import best_match
+from app.agents.groq_client import get_async_groq_client, log_cache_usage
+from app.agents.context_loader import load_context, wrap_user_input
+from app.core.logger import get_logger
 
-# Use settings for API Key
-client = Groq(api_key=settings.GROQ_API_KEY)
+logger = get_logger("manager")
+
+# Shared client: connection pool reused across agents
+client = get_async_groq_client()
 
 # Load hardened system prompt from context file
 SYSTEM_PROMPT = load_context("manager")
 
+MODEL = "openai/gpt-oss-120b"
+# Sampled for variety, so plans are not cached: the same form gives a new story
+PLAN_TEMPERATURE = 0.7
+
+# Structure the rest of the pipeline reads from a plan
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["plan", "chapitres", "morale", "personnages", "elements_cles"],
+    "properties": {
+        "plan": {
+            "type": "object",
+            "required": ["titre", "age_cible"]
+        },
+        "chapitres": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["numero", "titre", "resume", "duree_minutes"],
+                "properties": {
+                    "numero": {"type": "integer"},
+                    "titre": {"type": "string"},
+                    "resume": {"type": "string"},
+                    "duree_minutes": {"type": "number"}
+                }
+            }
+        },
+        "personnages": {
+            "type": "array",
+            "items": {"type": "object", "required": ["nom"]}
+        },
+        "elements_cles": {
+            "type": "object",
+            "required": ["peurs_evitees"],
+            "properties": {"peurs_evitees": {"type": "array"}}
+        }
+    }
+}
+
+# Validator built once at import
+_PLAN_VALIDATOR = Draft202012Validator(PLAN_SCHEMA)
+
 
 def calculate_chapter_count(duration_minutes: int) -> int:
     """Calculate the expected number of chapters based on duration.
@@ -23,14 +67,67 @@ def calculate_chapter_count(duration_minutes: int) -> int:
     return max(1, math.ceil(duration_minutes / 2))
 
 
-def get_user_prompt(age, interests, peurs, keywords, moral, type_histoire, duree_minutes, personnage, transcription=None):
+# Static part of the user prompt, kept byte-identical so providers can cache the prefix
+PLAN_INSTRUCTIONS = """
+Analyse les données de l'utilisateur ci-dessous et crée un plan d'histoire.
+Retourne UNIQUEMENT le JSON suivant (pas de texte avant ou après):
+{
+  "plan": {"titre": "...", "type_histoire": "...", "duree_estimee": number, "age_cible": number, "personnage_principal": "..."},
+  "chapitres": [{"numero": 1, "titre": "...", "resume": "...", "duree_minutes": number}],
+  "morale": {"valeur_principale": "...", "message": "...", "integration": "..."},
+  "personnages": [{"nom": "...", "role": "...", "description": "..."}],
+  "elements_cles": {"keywords_utilises": [], "interets_integres": [], "peurs_evitees": []}
+}
+
+"""
+
+
+# Numeric fields the LLM sometimes returns as strings, e.g. "duree_minutes": "2"
+PLAN_NUMBER_FIELDS = {"numero": int, "duree_minutes": float}
+
+
+def _to_number(value: Any, kind: type) -> Any:
+    """Convert a numeric string to kind, leaving anything else unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        number = float(value.strip().replace(",", "."))
+    except ValueError:
+        return value
+    if number.is_integer():
+        return int(number)
+    return number if kind is float else value
+
+
+def _coerce_plan_numbers(plan: Dict[str, Any]) -> None:
+    """Turn numeric strings into numbers in place, before schema validation."""
+    if isinstance(plan.get("plan"), dict) and "age_cible" in plan["plan"]:
+        plan["plan"]["age_cible"] = _to_number(plan["plan"]["age_cible"], int)
+    for chapter in plan.get("chapitres") or []:
+        if not isinstance(chapter, dict):
+            continue
+        for field, kind in PLAN_NUMBER_FIELDS.items():
+            if field in chapter:
+                chapter[field] = _to_number(chapter[field], kind)
+
+
+def _validate_plan(plan: Dict[str, Any]) -> None:
+    """Raise ValueError if the plan does not match PLAN_SCHEMA."""
+    error = best_match(_PLAN_VALIDATOR.iter_errors(plan))
+    if error is not None:
+        location = "/".join(str(part) for part in error.absolute_path) or "plan"
+        raise ValueError(f"Invalid plan ({location}): {error.message}")
+
+
+def get_user_prompt(age, interests, peurs, keywords, moral, type_histoire, duree_minutes, personnage, transcription=None, expected_chapters=None):
     """Build user prompt with input isolation (XML wrapped)."""
     
-    # Calculate expected chapter count
-    expected_chapters = calculate_chapter_count(duree_minutes)
+    # Calculate expected chapter count unless the caller already did
+    if expected_chapters is None:
+        expected_chapters = calculate_chapter_count(duree_minutes)
     
     # Build the raw user data
-    raw_input = f"""
+    parts = [f"""
 Age de l'enfant: {age}
 Intérêts: {interests}
 Peurs à éviter: {peurs}
@@ -40,31 +137,22 @@ Type d'histoire: {type_histoire}
 Durée souhaitée: {duree_minutes} minutes
 Nombre de chapitres requis: {expected_chapters} (OBLIGATOIRE - ne pas modifier)
 Personnage principal: {personnage}
-"""
+"""]
     if transcription:
-        raw_input += f"Transcription audio de l'enfant: {transcription}\n"
+        parts.append(f"Transcription audio de l'enfant: {transcription}\n")
+    raw_input = "".join(parts)
     
     # Wrap in XML tags for input isolation
     wrapped_input = wrap_user_input(raw_input)
     
-    prompt = f"""
-{wrapped_input}
-
-Analyse les données ci-dessus et crée un plan d'histoire.
-Retourne UNIQUEMENT le JSON suivant (pas de texte avant ou après):
-{{
-  "plan": {{"titre": "...", "type_histoire": "...", "duree_estimee": number, "age_cible": number, "personnage_principal": "..."}},
-  "chapitres": [{{"numero": 1, "titre": "...", "resume": "...", "duree_minutes": number}}],
-  "morale": {{"valeur_principale": "...", "message": "...", "integration": "..."}},
-  "personnages": [{{"nom": "...", "role": "...", "description": "..."}}],
-  "elements_cles": {{"keywords_utilises": [], "interets_integres": [], "peurs_evitees": []}}
-}}
-"""
+    # Static instructions first so the prompt prefix is identical across requests
+    prompt = "".join((PLAN_INSTRUCTIONS, wrapped_input, "\n"))
     return prompt
 
-def create_story_plan(state: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generates the story plan based on user input in state.
+def _build_plan_prompt(state: Dict[str, Any]) -> tuple[str, int, int]:
+    """Build the plan prompt from user input in state.
+    
+    Returns (prompt, duree_minutes, expected_chapters).
     """
     user_input = state.get("user_input", {})
     transcription = state.get("transcription")
@@ -85,44 +173,65 @@ def create_story_plan(state: Dict[str, Any]) -> Dict[str, Any]:
         type_histoire=user_input.get("type_histoire", "Aventure"),
         duree_minutes=duree_minutes,
         personnage=user_input.get("personnage", ""),
-        transcription=transcription
+        transcription=transcription,
+        expected_chapters=expected_chapters
     )
+    return prompt, duree_minutes, expected_chapters
+
+
+async def _complete(model: str, system: str, prompt: str, **params) -> str:
+    """Run a JSON-mode chat completion and return the raw response text."""
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        **params
+    )
+    log_cache_usage("manager", completion.usage)
+    return completion.choices[0].message.content
+
+
+def _finalize_plan(content: str, duree_minutes: int, expected_chapters: int) -> Dict[str, Any]:
+    """Parse and validate the plan returned by the LLM."""
+    plan = orjson.loads(content)
+    
+    # Check if LLM returned an error response (content rejected)
+    if plan.get("error") == True:
+        user_message = plan.get("message", "Ce thème n'est pas adapté pour une histoire pour enfants.")
+        return {"error": user_message}
+    
+    _coerce_plan_numbers(plan)
+    _validate_plan(plan)
+    
+    # Validate and enforce chapter count
+    if "chapitres" in plan:
+        actual_chapters = len(plan["chapitres"])
+        if actual_chapters != expected_chapters:
+            # Log the discrepancy but adjust durations to match
+            logger.warning(
+                f"Chapter count mismatch: expected {expected_chapters}, got {actual_chapters}. "
+                f"Duration: {duree_minutes}min"
+            )
+            
+            # Redistribute time evenly across actual chapters
+            time_per_chapter = duree_minutes / actual_chapters
+            for chapter in plan["chapitres"]:
+                chapter["duree_minutes"] = round(time_per_chapter, 1)
+    
+    return {"plan": plan}
+
+
+async def create_story_plan(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generates the story plan based on user input in state.
+    """
+    prompt, duree_minutes, expected_chapters = _build_plan_prompt(state)
     
     try:
-        completion = client.chat.completions.create(
-            model="openai/gpt-oss-120b",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        content = completion.choices[0].message.content
-        plan = json.loads(content)
-        
-        # Check if LLM returned an error response (content rejected)
-        if plan.get("error") == True:
-            user_message = plan.get("message", "Ce thème n'est pas adapté pour une histoire pour enfants.")
-            return {"error": user_message}
-        
-        # Validate and enforce chapter count
-        if "chapitres" in plan:
-            actual_chapters = len(plan["chapitres"])
-            if actual_chapters != expected_chapters:
-                # Log the discrepancy but adjust durations to match
-                from app.core.logger import get_logger
-                logger = get_logger(__name__)
-                logger.warning(
-                    f"Chapter count mismatch: expected {expected_chapters}, got {actual_chapters}. "
-                    f"Duration: {duree_minutes}min"
-                )
-                
-                # Redistribute time evenly across actual chapters
-                time_per_chapter = duree_minutes / actual_chapters
-                for chapter in plan["chapitres"]:
-                    chapter["duree_minutes"] = round(time_per_chapter, 1)
-        
-        return {"plan": plan}
+        content = await _complete(MODEL, SYSTEM_PROMPT, prompt, temperature=PLAN_TEMPERATURE)
+        return _finalize_plan(content, duree_minutes, expected_chapters)
     except Exception as e:
         return {"error": f"Manager Error: {str(e)}"}
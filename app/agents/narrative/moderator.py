@@ -1,15 +1,102 @@
-import json
-from groq import Groq
-from app.core.config import settings
-from app.agents.context_loader import load_context, wrap_content_for_moderation, get_user_friendly_error
+import asyncio
+import orjson
+import re
+from typing import Optional
+from app.agents.groq_client import get_async_groq_client, log_cache_usage
+from app.agents.context_loader import (
+    load_context, wrap_content_for_moderation, wrap_content_to_verify, wrap_story_context,
+    get_user_friendly_error
+)
+from app.agents.llm_cache import llm_cached
+from app.core.logger import get_logger
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+logger = get_logger("moderator")
+
+client = get_async_groq_client()
 
 # Load hardened system prompt from context file
 SYSTEM_PROMPT = load_context("moderator")
 
+MODEL = "llama-3.3-70b-versatile"
+
+# A rejection is final as soon as the model emits it
+REJECTION_RE = re.compile(r'"approved"\s*:\s*false')
+
+
+def _is_verdict(content: str) -> bool:
+    """Cache check: the response holds a usable verdict."""
+    _parse_verdict(content)
+    return True
 
-def verify_coherence(text: str, context: dict) -> dict:
+
+def _is_batch_verdict(content: str) -> bool:
+    """Cache check: the batch response holds verdicts."""
+    data = orjson.loads(content)
+    return isinstance(data, dict) and isinstance(data.get("results"), list)
+
+
+@llm_cached(name="moderator", validate=_is_verdict)
+async def _complete(model: str, system: str, prompt: str, **params) -> str:
+    """
+    Stream a chat completion and return the response text.
+    Stops reading (and closes the stream) as soon as a rejection is parseable.
+    """
+    text = ""
+    async with await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        stream=True,
+        **params
+    ) as stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            text += delta
+            # Only the tail can contain a newly completed match
+            if REJECTION_RE.search(text, max(0, len(text) - len(delta) - 32)):
+                break
+    return text
+
+
+@llm_cached(name="moderator_batch", validate=_is_batch_verdict)
+async def _complete_json(model: str, system: str, prompt: str, **params) -> str:
+    """Run a JSON-mode chat completion and return the raw response text."""
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        **params
+    )
+    log_cache_usage("moderator", completion.usage)
+    return completion.choices[0].message.content
+
+
+def _parse_verdict(content: str) -> dict:
+    """Parse the moderator verdict, including a stream cut short on rejection."""
+    start = content.find("{")
+    end = content.rfind("}")
+    if start != -1 and end > start:
+        return orjson.loads(content[start:end + 1])
+    if REJECTION_RE.search(content):
+        return {
+            "approved": False,
+            "safe_for_children": False,
+            "reason": "Rejected by moderator",
+            "severity": "rejected"
+        }
+    raise ValueError("No JSON verdict in moderator response")
+
+
+async def verify_coherence(text: str, context: dict) -> dict:
     """
     Verifies if the chapter text is coherent and safe for children.
     Uses hardened context with input isolation.
@@ -36,36 +123,119 @@ Retourne UNIQUEMENT ce JSON:
 """
     
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
-        result = json.loads(completion.choices[0].message.content)
-        
-        # Add user-friendly message if rejected
-        if not result.get("approved", True) or result.get("severity") == "rejected":
-            result["user_message"] = get_user_friendly_error("MODERATION_FAILED")
-        else:
-            result["user_message"] = None
-            
-        # Map to legacy format for compatibility
-        result["coherent"] = result.get("approved", True)
+        content = await _complete(MODEL, SYSTEM_PROMPT, prompt, temperature=0.1)
+        return _finalize_verdict(_parse_verdict(content))
         
-        return result
+    except Exception as e:
+        logger.error(f"Moderator Error: {e}")
+        return _rejected_on_error(e)
+
+
+async def verify_coherence_batch(texts: list[str], context: dict) -> list[dict]:
+    """
+    Verifies several chapters in a single moderation request.
+    
+    Returns one verdict per text, in the same order and format as verify_coherence.
+    """
+    if len(texts) == 1:
+        return [await verify_coherence(texts[0], context)]
+
+    wrapped_context = wrap_story_context(context)
+    chapters = "\n\n".join(
+        f"Chapitre {i}:\n{wrap_content_to_verify(text)}"
+        for i, text in enumerate(texts, 1)
+    )
+    
+    prompt = f"""
+{chapters}
+
+{wrapped_context}
+
+Évalue chacun de ces {len(texts)} chapitres pour une histoire d'enfant.
+Retourne UNIQUEMENT ce JSON, avec un résultat par chapitre:
+{{
+    "results": [
+        {{
+            "numero": 1,
+            "approved": true/false,
+            "safe_for_children": true/false,
+            "age_appropriate": true/false,
+            "reason": "Explication si rejeté",
+            "severity": "safe|mild_concern|rejected"
+        }}
+    ]
+}}
+"""
+    
+    try:
+        content = await _complete_json(MODEL, SYSTEM_PROMPT, prompt, temperature=0.1)
+        results = _align_batch(orjson.loads(content), len(texts))
         
     except Exception as e:
-        print(f"Moderator Error: {e}")
-        # Fail CLOSED for security - reject on error
-        return {
-            "coherent": False,
-            "approved": False,
-            "safe_for_children": False,
-            "reason": f"Moderation check failed: {str(e)}",
-            "user_message": get_user_friendly_error("GENERATION_ERROR"),
-            "severity": "rejected"
-        }
+        logger.error(f"Moderator Error: {e}")
+        return [_rejected_on_error(e) for _ in texts]
+    
+    verdicts = [None if result is None else _finalize_verdict(result) for result in results]
+    
+    # Chapters without a clear verdict are never approved on the batch's
+    # word: each one is moderated again on its own
+    missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    if missing:
+        logger.warning(f"No batch verdict for chapters {[i + 1 for i in missing]}, moderating them one by one")
+        single = await asyncio.gather(*(verify_coherence(texts[i], context) for i in missing))
+        for i, verdict in zip(missing, single):
+            verdicts[i] = verdict
+    
+    return verdicts
+
+
+def _align_batch(data: dict, count: int) -> list[Optional[dict]]:
+    """
+    Map a batch response to one verdict per chapter, in order.
+    Chapters without a verdict carrying a boolean "approved" map to None;
+    a response that is not a list of exactly one verdict per chapter maps
+    every chapter to None.
+    """
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != count:
+        return [None] * count
+    
+    by_number = {}
+    for result in results:
+        try:
+            number = int(result["numero"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if isinstance(result.get("approved"), bool):
+            by_number[number] = result
+    return [by_number.get(i) for i in range(1, count + 1)]
+
+
+def _finalize_verdict(result: dict) -> dict:
+    """Add the user message and legacy keys to a parsed verdict."""
+    # Fail CLOSED: only an explicit approval counts
+    approved = result.get("approved", False) is True
+    result["approved"] = approved
+    
+    # Add user-friendly message if rejected
+    if not approved or result.get("severity") == "rejected":
+        result["user_message"] = get_user_friendly_error("MODERATION_FAILED")
+    else:
+        result["user_message"] = None
+        
+    # Map to legacy format for compatibility
+    result["coherent"] = approved
+    
+    return result
+
+
+def _rejected_on_error(e: Exception) -> dict:
+    # Fail CLOSED for security - reject on error
+    return {
+        "coherent": False,
+        "approved": False,
+        "safe_for_children": False,
+        "reason": f"Moderation check failed: {str(e)}",
+        "user_message": get_user_friendly_error("GENERATION_ERROR"),
+        "severity": "rejected"
+    }
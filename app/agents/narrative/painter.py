@@ -1,56 +1,143 @@
+import hashlib
 import os
-import requests
+import shutil
+import httpx
 from pathlib import Path
 from app.core.config import settings
+from app.core.http import get_async_http_client, retry_transient, retry_unprocessed
+from app.core.logger import get_logger
+
+logger = get_logger("painter")
 
 API_URL = "https://modelslab.com/api/v7/images/text-to-image"
+MODEL_ID = "nano-banana-t2i"
+IMAGE_SIZE = 512
+
+IMAGE_DIR = Path("app/static/images")
+# Generated images keyed by prompt hash, reused for identical prompts
+IMAGE_CACHE_DIR = IMAGE_DIR / "cache"
+
+# Download chunk size: bounds memory to one chunk per image in flight
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _build_payload(prompt: str) -> dict:
+    return {
+        "prompt": prompt,
+        "model_id": MODEL_ID,
+        "key": settings.STABLE_DIFFUSION_API_KEY,
+        "width": IMAGE_SIZE,
+        "height": IMAGE_SIZE,
+        "samples": 1
+    }
+
+
+def _extract_image_url(data: dict):
+    if "output" in data and data["output"]:
+        return data["output"][0]
+    return None
+
+
+def _new_image_file(chapter_num: int) -> Path:
+    # Save to static/images
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+
+    filename = f"chapter_{chapter_num}_{os.urandom(4).hex()}.png"
+    return IMAGE_DIR / filename
+
+
+def _cache_path(prompt: str) -> Path:
+    key = hashlib.sha256(f"{prompt}|{MODEL_ID}|{IMAGE_SIZE}x{IMAGE_SIZE}".encode()).hexdigest()
+    return IMAGE_CACHE_DIR / f"{key}.png"
+
+
+def _link(src: Path, dst: Path):
+    # Hard link when possible, copy otherwise (e.g. across filesystems)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _from_cache(prompt: str, chapter_num: int) -> str:
+    """Return a chapter image copied from the cache, or "" on a miss."""
+    cached = _cache_path(prompt)
+    if not cached.exists():
+        return ""
+    file_path = _new_image_file(chapter_num)
+    try:
+        _link(cached, file_path)
+    except OSError as e:
+        logger.warning(f"Painter cache error: {e}")
+        return ""
+    return f"/static/images/{file_path.name}"
+
+
+def _store_in_cache(prompt: str, file_path: Path):
+    IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cached = _cache_path(prompt)
+    if cached.exists():
+        return
+    # Publish under a temp name then rename, so readers never see a partial entry
+    tmp_path = cached.with_name(f"{cached.stem}.{os.urandom(4).hex()}.tmp")
+    try:
+        _link(file_path, tmp_path)
+        os.replace(tmp_path, cached)
+    except OSError as e:
+        logger.warning(f"Painter cache error: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+# Each generation is billed: only retry if the API did not take the request
+@retry_unprocessed
+async def _request_image_url(client: httpx.AsyncClient, prompt: str):
+    resp = await client.post(API_URL, json=_build_payload(prompt))
+    resp.raise_for_status()
+    return _extract_image_url(resp.json())
+
+
+@retry_transient
+async def _download(client: httpx.AsyncClient, url: str, path: Path):
+    async with client.stream("GET", url) as resp:
+        resp.raise_for_status()
+        with open(path, "wb") as f:
+            async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
 
-def generate_image(prompt: str, chapter_num: int) -> str:
+
+async def generate_image(prompt: str, chapter_num: int) -> str:
     """
     Generates an image for the chapter and saves it.
+    Runs on the shared async client, concurrently with the other agents.
     Returns the relative path to the image.
     """
+    cached_url = _from_cache(prompt, chapter_num)
+    if cached_url:
+        return cached_url
+
     if not settings.STABLE_DIFFUSION_API_KEY:
-        print("Warning: No Stable Diffusion API Key. Skipping image generation.")
+        logger.warning("No Stable Diffusion API Key. Skipping image generation.")
         return ""
 
-    payload = {
-        "prompt": prompt,
-        "model_id": "nano-banana-t2i",
-        "key": settings.STABLE_DIFFUSION_API_KEY,
-        "width": 512,
-        "height": 512,
-        "samples": 1
-    }
-    
+    client = get_async_http_client()
     try:
-        resp = requests.post(API_URL, json=payload, timeout=60)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        image_url = None
-        if "output" in data and data["output"]:
-            image_url = data["output"][0]
-        
+        image_url = await _request_image_url(client, prompt)
         if not image_url:
             return ""
-            
-        # Download and save
-        img_resp = requests.get(image_url, timeout=60)
-        img_resp.raise_for_status()
-        
-        # Save to static/images
-        output_dir = Path("app/static/images")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        filename = f"chapter_{chapter_num}_{os.urandom(4).hex()}.png"
-        file_path = output_dir / filename
-        
-        with open(file_path, "wb") as f:
-            f.write(img_resp.content)
-            
-        return f"/static/images/{filename}"
-        
+
+        # Stream the download to a temp file, renamed once complete, so a
+        # failed or cancelled download never leaves a truncated image
+        file_path = _new_image_file(chapter_num)
+        tmp_path = file_path.with_suffix(".part")
+        try:
+            await _download(client, image_url, tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        _store_in_cache(prompt, file_path)
+        return f"/static/images/{file_path.name}"
+
     except Exception as e:
-        print(f"Painter Error: {e}")
+        logger.error(f"Painter Error: {e}")
         return ""
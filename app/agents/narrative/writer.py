@@ -1,15 +1,40 @@
-import os
-from groq import Groq
-from app.core.config import settings
+from app.agents.groq_client import get_async_groq_client
 from app.agents.context_loader import load_context, wrap_chapter_instructions, get_user_friendly_error
+from app.agents.llm_cache import llm_cached
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+client = get_async_groq_client()
 
 # Load hardened system prompt from context file
 SYSTEM_PROMPT = load_context("writer")
 
+MODEL = "llama-3.3-70b-versatile"
 
-def generate_chapter_content(prompt: str, context: str = "") -> str:
+# Marker the writer emits when it refuses a chapter
+ERROR_MARKER = "[ERREUR_CONTENU]"
+
+
+@llm_cached(name="writer", validate=lambda content: ERROR_MARKER not in content)
+async def _complete(model: str, system: str, prompt: str, **params) -> str:
+    """Stream a chat completion and return the full response text."""
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        stream=True,
+        **params
+    )
+    pieces = []
+    append = pieces.append
+    async with stream:
+        async for chunk in stream:
+            if chunk.choices and (text := chunk.choices[0].delta.content):
+                append(text)
+    return "".join(pieces).strip()
+
+
+async def generate_chapter_content(prompt: str, context: str = "") -> str:
     """
     Generates the text content for a chapter.
     Uses hardened context with input isolation.
@@ -34,19 +59,10 @@ Retourne UNIQUEMENT le texte narratif (pas de JSON, pas de markdown).
 """
     
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": full_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1024
-        )
-        content = completion.choices[0].message.content
+        content = await _complete(MODEL, SYSTEM_PROMPT, full_prompt, temperature=0.7, max_tokens=1024)
         
         # Check for error marker from the AI
-        if "[ERREUR_CONTENU]" in content:
+        if ERROR_MARKER in content:
             raise RuntimeError(get_user_friendly_error("CONTENT_REJECTED"))
         
         return content
@@ -1,20 +1,86 @@
+import asyncio
 import os
-from groq import Groq
-from app.core.config import settings
+import shutil
+import tempfile
+from typing import Optional
+from app.agents.groq_client import get_async_groq_client
+from app.core.logger import get_logger
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+logger = get_logger("s2t")
 
-def transcribe_audio(audio_file_path: str) -> dict:
+client = get_async_groq_client()
+
+MODEL = "whisper-large-v3-turbo"
+
+# Recordings above this size are re-encoded before upload, when ffmpeg is available
+TRANSCODE_MIN_BYTES = 1024 * 1024
+
+# Whisper works on 16 kHz mono; Opus at 32 kbps keeps it intelligible
+TRANSCODE_ARGS = ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "32k"]
+
+# A transcode taking longer than this is abandoned and the original uploaded
+TRANSCODE_TIMEOUT_SECONDS = 30
+
+
+async def _transcode_for_upload(audio_file_path: str) -> Optional[str]:
+    """
+    Re-encode a large recording to 16 kHz mono Opus to shrink the upload.
+    Returns the path of the smaller file, or None to upload the original.
+    The file is written to the system temp dir, never under app/static.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg or os.path.getsize(audio_file_path) < TRANSCODE_MIN_BYTES:
+        return None
+
+    fd, output_path = tempfile.mkstemp(suffix=".ogg")
+    os.close(fd)
+    transcoded = False
+    try:
+        process = await asyncio.create_subprocess_exec(
+            ffmpeg, "-nostdin", "-loglevel", "error", "-y",
+            "-i", audio_file_path, *TRANSCODE_ARGS, output_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), TRANSCODE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            stderr = b"timed out"
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            logger.warning(f"Transcode failed, uploading original: {stderr.decode(errors='replace').strip()}")
+            return None
+        transcoded = True
+        return output_path
+    except OSError as e:
+        logger.warning(f"Transcode failed, uploading original: {e}")
+        return None
+    finally:
+        if not transcoded and os.path.exists(output_path):
+            os.remove(output_path)
+
+async def transcribe_audio(audio_file_path: str) -> dict:
     """
     Transcribes audio file to text using Groq Whisper.
+    Large recordings are downsampled first when ffmpeg is installed.
     """
+    upload_path = None
     try:
-        with open(audio_file_path, "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=(os.path.basename(audio_file_path), file.read()),
-                model="whisper-large-v3",
+        upload_path = await _transcode_for_upload(audio_file_path)
+        with open(upload_path or audio_file_path, "rb") as file:
+            transcription = await client.audio.transcriptions.create(
+                file=(os.path.basename(upload_path or audio_file_path), file),
+                model=MODEL,
                 response_format="json"
             )
             return {"text": transcription.text}
     except Exception as e:
         return {"error": str(e)}
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
@@ -1,7 +1,11 @@
 import os
+from functools import lru_cache
 from pathlib import Path
-from elevenlabs import ElevenLabs
+from elevenlabs import AsyncElevenLabs
 from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("narrator")
 
 # Voice IDs for different languages
 VOICE_MAP = {
@@ -16,10 +20,30 @@ DEFAULT_VOICE = VOICE_MAP["fr"]
 # Model
 TTS_MODEL = "eleven_multilingual_v2"
 
+# Size of the audio chunks read from the streaming response
+AUDIO_CHUNK_SIZE = 4096
+
+
+@lru_cache(maxsize=1)
+def get_async_elevenlabs_client() -> AsyncElevenLabs:
+    """Return the process-wide async ElevenLabs client."""
+    return AsyncElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+
 
-def generate_audio(text: str, chapter_num: int, lang: str = "fr") -> str:
+def _new_audio_file(chapter_num: int, lang: str) -> Path:
+    # Save to static/audio
+    output_dir = Path("app/static/audio")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Include language in filename
+    filename = f"chapter_{chapter_num}_{lang}_{os.urandom(4).hex()}.mp3"
+    return output_dir / filename
+
+
+async def generate_audio(text: str, chapter_num: int, lang: str = "fr") -> str:
     """
     Generates audio from text using ElevenLabs.
+    Async, so chapter narrations can be synthesized concurrently.
     
     Args:
         text: The text to convert to speech
@@ -30,42 +54,40 @@ def generate_audio(text: str, chapter_num: int, lang: str = "fr") -> str:
         Relative path to audio file or empty string on error.
     """
     if not settings.ELEVENLABS_API_KEY:
-        print("Warning: No ElevenLabs API Key. Skipping audio generation.")
+        logger.warning("No ElevenLabs API Key. Skipping audio generation.")
         return ""
     
     # Get voice for language
     voice_id = VOICE_MAP.get(lang, DEFAULT_VOICE)
     
-    client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+    client = get_async_elevenlabs_client()
     
     try:
-        audio_generator = client.text_to_speech.convert(
+        # Streaming endpoint: audio bytes arrive while the speech is still being synthesized
+        audio_stream = client.text_to_speech.stream(
             text=text,
             voice_id=voice_id,
-            model_id=TTS_MODEL
+            model_id=TTS_MODEL,
+            request_options={"chunk_size": AUDIO_CHUNK_SIZE}
         )
         
-        # Save to static/audio
-        output_dir = Path("app/static/audio")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Include language in filename
-        filename = f"chapter_{chapter_num}_{lang}_{os.urandom(4).hex()}.mp3"
-        file_path = output_dir / filename
+        file_path = _new_audio_file(chapter_num, lang)
         
+        # Chunks are small; writes between network reads do not stall the loop
         with open(file_path, "wb") as f:
-            for chunk in audio_generator:
-                f.write(chunk)
+            async for chunk in audio_stream:
+                if chunk:
+                    f.write(chunk)
         
-        print(f"Audio generated: {filename} (lang={lang}, voice={voice_id})")
-        return f"/static/audio/{filename}"
+        logger.debug(f"Audio generated: {file_path.name} (lang={lang}, voice={voice_id})")
+        return f"/static/audio/{file_path.name}"
         
     except Exception as e:
-        print(f"Narrator Error: {e}")
+        logger.error(f"Narrator Error: {e}")
         return ""
 
 
-def generate_audio_for_translation(text: str, chapter_id: int, lang: str) -> str:
+async def generate_audio_for_translation(text: str, chapter_id: int, lang: str) -> str:
     """
     Generates audio for a translated chapter.
     Used for on-demand audio generation when user requests it.
@@ -79,7 +101,7 @@ def generate_audio_for_translation(text: str, chapter_id: int, lang: str) -> str
         Relative path to audio file or empty string on error.
     """
     if lang not in VOICE_MAP:
-        print(f"Unsupported language for TTS: {lang}")
+        logger.warning(f"Unsupported language for TTS: {lang}")
         return ""
     
-    return generate_audio(text, chapter_id, lang)
+    return await generate_audio(text, chapter_id, lang)
@@ -1,15 +1,43 @@
-import json
-import re
-from groq import Groq
-from app.core.config import settings
+import orjson
+from app.agents.groq_client import get_async_groq_client, log_cache_usage
 from typing import Dict
-from app.agents.context_loader import load_context
+from app.agents.context_loader import load_context, wrap_translation_input
+from app.agents.llm_cache import llm_cached
+from app.core.logger import get_logger
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+logger = get_logger("translator")
+
+client = get_async_groq_client()
 
 # Load hardened system prompt from context file
 SYSTEM_PROMPT = load_context("translator")
 
+MODEL = "llama-3.3-70b-versatile"
+
+# Invisible RTL/LTR control characters stripped from LLM output
+_RTL_TABLE = {ord(c): None for c in "\u202b\u202e\u202a\u200f\u200e"}
+
+
+def _is_translation(raw: str) -> bool:
+    """Cache check: the response parses to a translated chapter."""
+    result = parse_translation(raw)
+    return "translated_content" in result or "chapter_content_translated" in result
+
+
+@llm_cached(name="translator", validate=_is_translation)
+async def _complete(model: str, system: str, prompt: str, **params) -> str:
+    """Run a chat completion and return the raw response text."""
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ],
+        **params
+    )
+    log_cache_usage("translator", completion.usage)
+    return completion.choices[0].message.content
+
 
 def extract_json(raw):
     """
@@ -27,31 +55,43 @@ def extract_json(raw):
     # Nettoyage Markdown
     raw = raw.replace("```json", "").replace("```", "")
 
-    # Nettoyage caractères invisibles RTL
-    rtl_chars = ["\u202b", "\u202e", "\u202a", "\u200f", "\u200e"]
-    for c in rtl_chars:
-        raw = raw.replace(c, "")
-
-    raw = raw.strip()
+    # Nettoyage caractères invisibles RTL (une seule passe)
+    raw = raw.translate(_RTL_TABLE).strip()
 
-    # Extraction JSON
-    match = re.search(r"\{.*\}", raw, re.DOTALL)
-    if not match:
-        print("\n--- RAW OUTPUT (pas de JSON détecté) ---\n")
-        print(raw)
+    # Extraction JSON : du premier "{" au dernier "}"
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start == -1 or end < start:
+        logger.debug("Pas de JSON détecté dans la réponse : %s", raw)
         raise ValueError("Impossible d'extraire un JSON valide.")
 
-    json_clean = match.group(0)
+    json_clean = raw[start:end + 1]
 
     try:
-        return json.loads(json_clean)
-    except json.JSONDecodeError as e:
-        print("\n--- JSON INVALID ---\n", json_clean)
+        return orjson.loads(json_clean)
+    except orjson.JSONDecodeError as e:
+        logger.debug("JSON invalide : %s", json_clean)
         raise e
 
 
+def parse_translation(raw) -> dict:
+    """
+    Parse a JSON-mode translation response.
+    Falls back to extract_json if the model still wrapped its output.
+    """
+    try:
+        result = orjson.loads(raw)
+    except (orjson.JSONDecodeError, TypeError):
+        return extract_json(raw)
 
-def traduire_chapitre(chapter_number: int, title: str, content: str, langue_cible: str) -> Dict[str, str]:
+    # Defensive cleanup of invisible RTL characters on string fields only
+    return {
+        key: value.translate(_RTL_TABLE).strip() if isinstance(value, str) else value
+        for key, value in result.items()
+    }
+
+
+async def traduire_chapitre(chapter_number: int, title: str, content: str, langue_cible: str) -> Dict[str, str]:
     """
     Translate a chapter to the target language.
     
@@ -66,58 +106,28 @@ def traduire_chapitre(chapter_number: int, title: str, content: str, langue_cibl
     """
     number = chapter_number
 
-    prompt = f"""
-Tu es l’agent traducteur du pipeline multi-agents.
-
-Ton rôle est de traduire proprement le chapitre en {langue_cible} :
-- créer un en-tête littéraire : <mot pour Chapitre> <numéro> – <titre traduit>
-- traduire fidèlement tout le contenu narratif
-
-RÈGLES :
-- Ne traduire aucun prénom.
-- Ne rien ajouter ni retirer.
-- Ne pas insérer de markdown.
-- Ne pas inclure de texte hors JSON.
-- Utiliser un JSON UTF-8 strict.
-- Le texte arabe doit être renvoyé sans caractères invisibles RTL.
-
-Données à traduire :
-
-NUMÉRO : {number}
-TITRE : {title}
-CONTENU : {content}
-
-Réponds UNIQUEMENT avec ce JSON :
-
-{{
-  "chapter_header_translated": "",
-  "chapter_content_translated": ""
-}}
-"""
+    source = f"NUMÉRO : {number}\nTITRE : {title}\nCONTENU : {content}"
+    wrapped_source, wrapped_lang = wrap_translation_input(source, langue_cible)
+    prompt = f"{wrapped_source}\n\n{wrapped_lang}\n"
 
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional translator for children's stories."},
-                {"role": "user", "content": prompt}
-            ],
+        raw = await _complete(
+            MODEL, SYSTEM_PROMPT, prompt,
             temperature=0.2,
+            response_format={"type": "json_object"}
         )
-
-        raw = completion.choices[0].message.content
-        result = extract_json(raw)
+        result = parse_translation(raw)
         
-        # Map from French keys to standardized format
-        translated_title = result.get("chapter_header_translated", result.get("translated_title", title))
-        translated_content = result.get("chapter_content_translated", result.get("translated_content", content))
+        # Keys from the context format, or the older French prompt keys
+        translated_title = result.get("translated_title", result.get("chapter_header_translated", title))
+        translated_content = result.get("translated_content", result.get("chapter_content_translated", content))
         
         return {
             "translated_title": translated_title,
             "translated_content": translated_content
         }
     except Exception as e:
-        print(f"Translation error for chapter {number}: {e}")
+        logger.error(f"Translation error for chapter {number}: {e}")
         # Return original text if translation fails
         return {
             "translated_title": title,
@@ -139,6 +149,7 @@ SUPPORTED_LANGUAGES = {
     "it": "Italian"
 }
 
+
 def get_language_name(lang_code: str) -> str:
     """Get full language name from code"""
     return SUPPORTED_LANGUAGES.get(lang_code, lang_code.title())
\ No newline at end of file
@@ -9,6 +9,9 @@ from app.core.logger import get_logger, log_error
 logger = get_logger("auth")
 router = APIRouter()
 
+# Checked against on unknown emails so every failed login costs one bcrypt verify
+_DUMMY_HASH = get_password_hash("x" * 16)
+
 # 1. Signup Endpoint
 @router.post("/signup", response_model=UserRead)
 def signup(user: UserCreate, session: Session = Depends(get_session)):
@@ -39,7 +42,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
     user = session.exec(statement).first()
     
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Always verify a hash so unknown emails are not faster to reject
+    hashed_password = user.hashed_password if user else _DUMMY_HASH
+    if not verify_password(form_data.password, hashed_password) or not user:
         logger.warning(f"Failed login attempt for: {form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
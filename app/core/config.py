@@ -21,5 +21,10 @@ class Settings:
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
     STABLE_DIFFUSION_API_KEY: str = os.getenv("STABLE_DIFFUSION_API_KEY")
     ELEVENLABS_API_KEY: str = os.getenv("ELEVENLABS_API_KEY")
+    
+    # Requests kept in flight per story generation stage and per story translation
+    # (at least 1: a zero-sized semaphore would block forever)
+    PIPELINE_CONCURRENCY: int = max(1, int(os.getenv("PIPELINE_CONCURRENCY", "3")))
+    TRANSLATION_CONCURRENCY: int = max(1, int(os.getenv("TRANSLATION_CONCURRENCY", "5")))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Chapter Pipeline for Ether Stories
+Runs the per-chapter agents (writer → moderator → narrator) as concurrent
+stages connected by bounded asyncio queues, so chapters are moderated and
+narrated while the next ones are being written. Chapter texts and
+illustrations only depend on the plan, so several chapters are written at
+once and the painter runs alongside from the start.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+from app.core.graph.state import Chapter
+from app.agents.narrative.writer import generate_chapter_content
+from app.agents.narrative.moderator import verify_coherence_batch
+from app.agents.narrative.painter import generate_image
+from app.agents.speech.text_to_speech import generate_audio
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("pipeline")
+
+# Sentinel closing a stage queue
+_DONE = object()
+
+# Chapters already waiting are moderated together, up to this many per request
+MODERATION_BATCH_SIZE = 3
+
+# Chapters written at the same time
+WRITER_CONCURRENCY = settings.PIPELINE_CONCURRENCY
+
+# Illustrations requested at the same time
+PAINTER_CONCURRENCY = settings.PIPELINE_CONCURRENCY
+
+# Narrations synthesized at the same time
+NARRATOR_CONCURRENCY = settings.PIPELINE_CONCURRENCY
+
+# Items a stage may run ahead of the next one before it waits (backpressure)
+STAGE_QUEUE_SIZE = MODERATION_BATCH_SIZE
+
+
+class PipelineError(Exception):
+    """Raised by a stage to stop the story with a user-facing message."""
+
+
+async def _run_all(tasks: List[asyncio.Task]):
+    """
+    Await every task. If one fails (or this is cancelled), cancel the
+    others and wait for them to finish before re-raising, so no request
+    keeps running for a story that has already stopped.
+    """
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def character_names(plan: Dict[str, Any]) -> str:
+    """Render the plan's character names for the chapter prompts."""
+    return str([p['nom'] for p in plan['personnages']])
+
+
+def build_chapter_prompt(plan: Dict[str, Any], chapter_info: Dict[str, Any], characters: str) -> str:
+    """Build the writer instructions for one chapter of the plan."""
+    return f"""
+    Titre de l'histoire: {plan['plan']['titre']}
+    Chapitre {chapter_info['numero']}: {chapter_info['titre']}
+    Résumé: {chapter_info['resume']}
+    Personnages: {characters}
+    Age cible: {plan['plan']['age_cible']}
+
+    Ecris le contenu de ce chapitre (environ 300 mots).
+    Style: Adapté aux enfants, engageant.
+    """
+
+
+async def _writer_stage(plan: Dict[str, Any], written: asyncio.Queue, contents: Dict[int, str]):
+    """
+    Write chapters concurrently and hand each one to the moderator as it is done.
+    Each chapter prompt only depends on the plan, so chapters are independent.
+    """
+    semaphore = asyncio.Semaphore(WRITER_CONCURRENCY)
+    # Same for every chapter, so render it once
+    characters = character_names(plan)
+
+    async def write(index: int, chapter_info: Dict[str, Any]):
+        async with semaphore:
+            logger.info(f"Writing chapter {index + 1}: {chapter_info.get('titre', 'Untitled')}")
+            try:
+                content = await generate_chapter_content(build_chapter_prompt(plan, chapter_info, characters))
+            except Exception as e:
+                raise PipelineError(str(e))
+        contents[index] = content
+        await written.put((index, content))
+
+    await _run_all([
+        asyncio.create_task(write(index, info)) for index, info in enumerate(plan["chapitres"])
+    ])
+    # Only close the queue on success: after an error nobody drains it, and the
+    # orchestrator cancels every stage anyway
+    await written.put(_DONE)
+
+
+async def _moderator_stage(plan: Dict[str, Any], written: asyncio.Queue, approved: List[asyncio.Queue]):
+    """Moderate written chapters and pass approved ones to the next stages."""
+    context = {
+        "age": plan["plan"]["age_cible"],
+        "peurs_evitees": plan["elements_cles"]["peurs_evitees"]
+    }
+    done = False
+    while not done:
+        batch = [await written.get()]
+        while len(batch) < MODERATION_BATCH_SIZE and not written.empty():
+            batch.append(written.get_nowait())
+        if batch[-1] is _DONE:
+            batch.pop()
+            done = True
+        if not batch:
+            continue
+
+        logger.info(f"Moderating chapters {[index + 1 for index, _ in batch]}")
+        results = await verify_coherence_batch([content for _, content in batch], context)
+
+        for item, result in zip(batch, results):
+            index = item[0]
+            if not result["coherent"]:
+                # Use user-friendly message if available, otherwise fall back to technical reason
+                error_msg = result.get("user_message") or result.get("reason") or "Contenu inapproprié détecté."
+                logger.warning(f"Chapter {index + 1} failed moderation: {error_msg}")
+                raise PipelineError(error_msg)
+
+            logger.info(f"Chapter {index + 1} passed moderation")
+            for queue in approved:
+                await queue.put(item)
+
+    # As in the writer: closed on success only
+    for queue in approved:
+        await queue.put(_DONE)
+
+
+async def _painter_stage(plan: Dict[str, Any], images: Dict[int, str]):
+    """
+    Generate an illustration for each chapter of the plan.
+    Image prompts come from the plan alone, so this does not wait for the writer;
+    it is cancelled with the other stages if a chapter is rejected.
+    """
+    semaphore = asyncio.Semaphore(PAINTER_CONCURRENCY)
+
+    async def paint(index: int, chapter_info: Dict[str, Any]):
+        async with semaphore:
+            logger.info(f"Generating image for chapter {index + 1}")
+            prompt = f"Illustration pour enfant: {chapter_info['titre']}. {chapter_info['resume']}"
+            images[index] = await generate_image(prompt, chapter_info["numero"])
+            logger.info(f"Image generated: {images[index]}")
+
+    await _run_all([
+        asyncio.create_task(paint(index, info)) for index, info in enumerate(plan["chapitres"])
+    ])
+
+
+async def _narrator_stage(plan: Dict[str, Any], approved: asyncio.Queue, audios: Dict[int, str]):
+    """Generate narration audio for approved chapters, a few at a time."""
+    semaphore = asyncio.Semaphore(NARRATOR_CONCURRENCY)
+
+    async def narrate(index: int, content: str):
+        async with semaphore:
+            chapter_info = plan["chapitres"][index]
+            logger.info(f"Generating audio for chapter {index + 1}")
+            audios[index] = await generate_audio(content, chapter_info["numero"])
+            logger.info(f"Audio generated: {audios[index]}")
+
+    tasks = []
+    try:
+        while (item := await approved.get()) is not _DONE:
+            tasks.append(asyncio.create_task(narrate(*item)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    await _run_all(tasks)
+
+
+async def run_chapter_pipeline(plan: Dict[str, Any]) -> List[Chapter]:
+    """
+    Generate every chapter of the plan through the stage pipeline.
+
+    Args:
+        plan: Story plan produced by the manager
+
+    Returns:
+        Generated chapters, in plan order
+
+    Raises:
+        PipelineError: If a chapter cannot be written or fails moderation
+    """
+    written: asyncio.Queue = asyncio.Queue(STAGE_QUEUE_SIZE)
+    to_narrate: asyncio.Queue = asyncio.Queue(STAGE_QUEUE_SIZE)
+    contents: Dict[int, str] = {}
+    images: Dict[int, str] = {}
+    audios: Dict[int, str] = {}
+
+    tasks = [
+        asyncio.create_task(_writer_stage(plan, written, contents)),
+        asyncio.create_task(_moderator_stage(plan, written, [to_narrate])),
+        asyncio.create_task(_painter_stage(plan, images)),
+        asyncio.create_task(_narrator_stage(plan, to_narrate, audios)),
+    ]
+    await _run_all(tasks)
+
+    chapters: List[Chapter] = []
+    for index, chapter_info in enumerate(plan["chapitres"]):
+        logger.info(f"Finalizing chapter {index + 1}: {chapter_info['titre']}")
+        chapters.append({
+            "numero": chapter_info["numero"],
+            "titre": chapter_info["titre"],
+            "resume": chapter_info["resume"],
+            "duree_minutes": chapter_info["duree_minutes"],
+            "contenu": contents[index],
+            "image_path": images.get(index),
+            "audio_path": audios.get(index),
+            "traduction": None
+        })
+    return chapters
@@ -32,15 +32,9 @@ class StoryState(TypedDict):
     # Plan
     plan: Optional[StoryPlan]
     
-    # Generation Loop
-    current_chapter_index: int
+    # Generation
     generated_chapters: List[Chapter]
     
-    # Temporary holding for current chapter generation
-    current_chapter_content: Optional[str]
-    current_chapter_image: Optional[str]
-    current_chapter_audio: Optional[str]
-    
     # Errors
     error: Optional[str]
     retry_count: int
@@ -0,0 +1,51 @@
+"""
+Shared HTTP client for Ether Stories
+One pooled async client reused by every outbound API call (Groq, ModelsLab),
+plus the retry policies for transient failures.
+"""
+
+from functools import lru_cache
+
+import httpx
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+HTTP_TIMEOUT = httpx.Timeout(60)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client."""
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Connection errors, rate limits and server errors are worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def is_unprocessed(exc: BaseException) -> bool:
+    """The server did not act on the request: rate limited, or never reached."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+# Decorator for idempotent async API calls: 3 attempts with jittered exponential backoff
+retry_transient = retry(
+    retry=retry_if_exception(is_retryable),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    reraise=True
+)
+
+# Same policy for non-idempotent (e.g. billed) calls, only when nothing was processed
+retry_unprocessed = retry(
+    retry=retry_if_exception(is_unprocessed),
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    reraise=True
+)
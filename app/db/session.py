@@ -1,11 +1,23 @@
+import orjson
 from sqlmodel import create_engine, Session, SQLModel
 from app.core.config import settings
 
 
-engine=create_engine(settings.DATABASE_URL, echo=True, pool_pre_ping=True)
+def _json_serializer(obj) -> str:
+    # JSON columns (story plans, translations) are serialized with orjson
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+engine=create_engine(
+    settings.DATABASE_URL,
+    echo=True,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
+)
 
 def get_session():
     with Session(engine) as session:
         yield session
 def create_db_models():
-	SQLModel.metadata.create_all(engine)
\ No newline at end of file
+	SQLModel.metadata.create_all(engine)
@@ -65,4 +65,17 @@ def test_login_success(client: TestClient):
     assert response.status_code == 200
     token_data = response.json()
     assert "access_token" in token_data
-    assert token_data["token_type"] == "bearer"
\ No newline at end of file
+    assert token_data["token_type"] == "bearer"
+
+def test_login_unknown_email(client: TestClient, monkeypatch):
+    # Unknown emails go through the same password check as known ones
+    from app.api import auth
+    checked = []
+    monkeypatch.setattr(auth, "verify_password", lambda plain, hashed: checked.append(hashed) or False)
+
+    response = client.post(
+        "/auth/token",
+        data={"username": "nobody@ether.com", "password": "mypassword"}
+    )
+    assert response.status_code == 401
+    assert checked == [auth._DUMMY_HASH]
@@ -0,0 +1,135 @@
+"""
+LLM Cache Tests
+===============
+Tests for the in-process LLM response cache.
+"""
+import asyncio
+import pytest
+from app.agents.llm_cache import LLMCache, llm_cached
+
+
+class TestLLMCache:
+    """Test LLMCache storage, expiry and eviction."""
+
+    def test_key_depends_on_all_parts(self):
+        """Test that model, system and prompt all change the key."""
+        base = LLMCache.make_key("model", "system", "prompt")
+        assert base == LLMCache.make_key("model", "system", "prompt")
+        assert base != LLMCache.make_key("other", "system", "prompt")
+        assert base != LLMCache.make_key("model", "other", "prompt")
+        assert base != LLMCache.make_key("model", "system", "other")
+
+    def test_get_set(self):
+        """Test storing and reading back a response."""
+        cache = LLMCache("test")
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+
+    def test_expired_entry_is_dropped(self):
+        """Test that entries past their TTL are not returned."""
+        cache = LLMCache("test", ttl=-1)
+        cache.set("key", "value")
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LLMCache("test", maxsize=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+
+class TestLLMCachedDecorator:
+    """Test the llm_cached decorator."""
+
+    def test_identical_requests_hit_cache(self):
+        """Test that a repeated request does not call the LLM again."""
+        calls = []
+
+        @llm_cached(name="test")
+        def complete(model, system, prompt, **params):
+            calls.append(prompt)
+            return f"answer to {prompt}"
+
+        assert complete("m", "s", "hello") == "answer to hello"
+        assert complete("m", "s", "hello", temperature=0.2) == "answer to hello"
+        assert calls == ["hello"]
+
+        complete("m", "s", "bye")
+        assert calls == ["hello", "bye"]
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed call is retried on the next request."""
+        calls = []
+
+        @llm_cached(name="test")
+        def complete(model, system, prompt, **params):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            complete("m", "s", "hello")
+        assert complete("m", "s", "hello") == "ok"
+        assert len(calls) == 2
+
+    def test_async_function_is_cached(self):
+        """Test that coroutine completion functions are cached too."""
+        calls = []
+
+        @llm_cached(name="test")
+        async def complete(model, system, prompt, **params):
+            calls.append(prompt)
+            return "async answer"
+
+        assert asyncio.run(complete("m", "s", "hello")) == "async answer"
+        assert asyncio.run(complete("m", "s", "hello")) == "async answer"
+        assert calls == ["hello"]
+
+    def test_decorator_shares_one_cache(self):
+        """Test that functions wrapped by the same decorator share entries."""
+        cached = llm_cached(name="test")
+
+        @cached
+        def complete(model, system, prompt, **params):
+            return "sync answer"
+
+        @cached
+        async def acomplete(model, system, prompt, **params):
+            return "async answer"
+
+        assert complete("m", "s", "hello") == "sync answer"
+        assert asyncio.run(acomplete("m", "s", "hello")) == "sync answer"
+
+    def test_rejected_responses_are_not_cached(self):
+        """Test that a response failing validation is requested again."""
+        calls = []
+
+        @llm_cached(name="test", validate=lambda text: text.startswith("{"))
+        def complete(model, system, prompt, **params):
+            calls.append(prompt)
+            return "prose" if len(calls) == 1 else "{}"
+
+        assert complete("m", "s", "hello") == "prose"
+        assert complete("m", "s", "hello") == "{}"
+        assert complete("m", "s", "hello") == "{}"
+        assert len(calls) == 2
+
+    def test_validation_error_counts_as_rejected(self):
+        """Test that a validator raising does not store the response."""
+        def validate(text):
+            raise ValueError("bad")
+
+        @llm_cached(name="test", validate=validate)
+        def complete(model, system, prompt, **params):
+            return "answer"
+
+        assert complete("m", "s", "hello") == "answer"
+        assert len(complete.cache) == 0
@@ -0,0 +1,117 @@
+"""
+Moderator Tests
+===============
+Tests for moderation verdict parsing and batched moderation.
+"""
+import asyncio
+import orjson
+import pytest
+from app.agents.narrative import moderator
+
+
+CONTEXT = {"age": 6, "peurs_evitees": ["le noir"]}
+
+
+class TestParseVerdict:
+    """Test verdict parsing from raw moderator responses."""
+
+    def test_json_verdict(self):
+        """Test that a complete verdict is parsed."""
+        assert moderator._parse_verdict('Voici: {"approved": true}') == {"approved": True}
+
+    def test_truncated_rejection(self):
+        """Test that a stream cut short on rejection is still a rejection."""
+        result = moderator._parse_verdict('{"approved": false, "reas')
+        assert result["approved"] is False
+
+    def test_no_verdict(self):
+        """Test that a response without a verdict raises ValueError."""
+        with pytest.raises(ValueError):
+            moderator._parse_verdict("Je ne sais pas.")
+
+
+class TestVerifyCoherenceBatch:
+    """Test batched moderation."""
+
+    def test_results_are_aligned(self, monkeypatch):
+        """Test that verdicts follow input order, whatever the response order."""
+        response = orjson.dumps({"results": [
+            {"numero": 2, "approved": False, "severity": "rejected"},
+            {"numero": 1, "approved": True, "severity": "safe"},
+        ]}).decode()
+        async def complete(*args, **kwargs):
+            return response
+        monkeypatch.setattr(moderator, "_complete_json", complete)
+
+        first, second = asyncio.run(moderator.verify_coherence_batch(["un", "deux"], CONTEXT))
+        assert first["coherent"] is True
+        assert first["user_message"] is None
+        assert second["coherent"] is False
+        assert second["user_message"]
+
+    def test_missing_verdict_is_moderated_alone(self, monkeypatch):
+        """Test that a chapter without a batch verdict is moderated on its own."""
+        response = orjson.dumps({"results": [
+            {"numero": 1, "approved": True},
+            {"numero": 2},
+        ]}).decode()
+        singles = []
+        async def complete_json(*args, **kwargs):
+            return response
+        async def complete(model, system, prompt, **params):
+            singles.append(prompt)
+            return '{"approved": false, "severity": "rejected"}'
+        monkeypatch.setattr(moderator, "_complete_json", complete_json)
+        monkeypatch.setattr(moderator, "_complete", complete)
+
+        results = asyncio.run(moderator.verify_coherence_batch(["un", "deux"], CONTEXT))
+        assert [r["coherent"] for r in results] == [True, False]
+        assert len(singles) == 1 and "deux" in singles[0]
+
+    def test_error_fails_closed(self, monkeypatch):
+        """Test that a failed request rejects every chapter."""
+        async def boom(*args, **kwargs):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(moderator, "_complete_json", boom)
+
+        results = asyncio.run(moderator.verify_coherence_batch(["un", "deux"], CONTEXT))
+        assert all(r["coherent"] is False for r in results)
+
+    def test_string_numbers(self, monkeypatch):
+        """Test that chapter numbers returned as strings are matched."""
+        response = orjson.dumps({"results": [
+            {"numero": "1", "approved": True},
+            {"numero": "2", "approved": True},
+        ]}).decode()
+        async def complete(*args, **kwargs):
+            return response
+        monkeypatch.setattr(moderator, "_complete_json", complete)
+
+        results = asyncio.run(moderator.verify_coherence_batch(["un", "deux"], CONTEXT))
+        assert [r["coherent"] for r in results] == [True, True]
+
+    def test_flat_verdict_is_not_applied_to_all(self, monkeypatch):
+        """Test that a single flat approval does not approve the whole batch."""
+        response = orjson.dumps({"approved": True, "severity": "safe"}).decode()
+        singles = []
+        async def complete_json(*args, **kwargs):
+            return response
+        async def complete(model, system, prompt, **params):
+            singles.append(prompt)
+            return '{"approved": true, "severity": "safe"}'
+        monkeypatch.setattr(moderator, "_complete_json", complete_json)
+        monkeypatch.setattr(moderator, "_complete", complete)
+
+        results = asyncio.run(moderator.verify_coherence_batch(["un", "deux"], CONTEXT))
+        assert [r["coherent"] for r in results] == [True, True]
+        assert len(singles) == 2
+
+    def test_verdict_without_approval_is_rejected(self):
+        """Test that a verdict missing "approved" fails closed."""
+        result = moderator._finalize_verdict({"severity": "safe"})
+        assert result["coherent"] is False
+        assert result["user_message"]
+
+    def test_system_prompt_allows_batches(self):
+        """Test that the hardened context documents the batch output format."""
+        assert '"results"' in moderator.SYSTEM_PROMPT
@@ -0,0 +1,91 @@
+"""
+Painter Tests
+=============
+Tests for the painter's prompt-keyed image cache.
+"""
+import asyncio
+import httpx
+import pytest
+from app.agents.narrative import painter
+
+
+@pytest.fixture
+def image_dirs(tmp_path, monkeypatch):
+    """Write images to a temporary directory."""
+    monkeypatch.setattr(painter, "IMAGE_DIR", tmp_path)
+    monkeypatch.setattr(painter, "IMAGE_CACHE_DIR", tmp_path / "cache")
+    return tmp_path
+
+
+class TestImageCache:
+    """Test reuse of images generated for an identical prompt."""
+
+    def test_cache_key_depends_on_prompt(self, image_dirs):
+        """Test that different prompts use different cache files."""
+        assert painter._cache_path("un chat") == painter._cache_path("un chat")
+        assert painter._cache_path("un chat") != painter._cache_path("un chien")
+
+    def test_miss(self, image_dirs):
+        """Test that an unknown prompt is not served from cache."""
+        assert painter._from_cache("un chat", 1) == ""
+
+    def test_hit_skips_generation(self, image_dirs, monkeypatch):
+        """Test that a cached prompt returns a new chapter file without an API call."""
+        first = image_dirs / "chapter_1_abcd.png"
+        first.write_bytes(b"png")
+        painter._store_in_cache("un chat", first)
+
+        def no_client():
+            raise AssertionError("API should not be called")
+        monkeypatch.setattr(painter, "get_async_http_client", no_client)
+
+        url = asyncio.run(painter.generate_image("un chat", 2))
+        assert url.startswith("/static/images/chapter_2_")
+        assert (image_dirs / url.rsplit("/", 1)[1]).read_bytes() == b"png"
+
+    def test_store_leaves_no_temp_file(self, image_dirs):
+        """Test that storing publishes only the final cache entry."""
+        image = image_dirs / "chapter_1_abcd.png"
+        image.write_bytes(b"png")
+        painter._store_in_cache("un chat", image)
+        assert list((image_dirs / "cache").iterdir()) == [painter._cache_path("un chat")]
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    """Response body cut off after the first chunk."""
+
+    async def __aiter__(self):
+        yield b"png"
+        raise httpx.ReadError("connection lost")
+
+
+class TestImageDownload:
+    """Test writing downloaded images to disk."""
+
+    def test_failed_download_leaves_no_file(self, image_dirs, monkeypatch):
+        """Test that an interrupted download does not leave a truncated image."""
+        def handler(request):
+            if request.method == "POST":
+                return httpx.Response(200, json={"output": ["https://images.test/1.png"]})
+            return httpx.Response(200, stream=BrokenStream())
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(painter, "get_async_http_client", lambda: client)
+        monkeypatch.setattr(painter.settings, "STABLE_DIFFUSION_API_KEY", "key")
+
+        assert asyncio.run(painter.generate_image("un chat", 1)) == ""
+        assert list(image_dirs.iterdir()) == []
+
+    def test_generation_not_retried_on_server_error(self, image_dirs, monkeypatch):
+        """Test that a billed generation request is not sent twice after a 5xx."""
+        posts = []
+        def handler(request):
+            posts.append(request)
+            return httpx.Response(500)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(painter, "get_async_http_client", lambda: client)
+        monkeypatch.setattr(painter.settings, "STABLE_DIFFUSION_API_KEY", "key")
+
+        assert asyncio.run(painter.generate_image("un chat", 1)) == ""
+        assert len(posts) == 1
@@ -0,0 +1,114 @@
+"""
+Chapter Pipeline Tests
+======================
+Tests for the staged chapter pipeline (agents are stubbed).
+"""
+import asyncio
+import pytest
+from app.core.graph import pipeline
+from app.core.graph.pipeline import run_chapter_pipeline, PipelineError
+
+
+def make_plan(chapter_count: int) -> dict:
+    """Build a plan with the given number of chapters."""
+    return {
+        "plan": {"titre": "Le Voyage", "age_cible": 6},
+        "personnages": [{"nom": "Léa"}],
+        "elements_cles": {"peurs_evitees": ["le noir"]},
+        "chapitres": [
+            {"numero": i, "titre": f"Chapitre {i}", "resume": "...", "duree_minutes": 2}
+            for i in range(1, chapter_count + 1)
+        ],
+    }
+
+
+PLAN = make_plan(4)
+
+# Enough chapters to fill the stage queue and every writer slot
+LONG_PLAN = make_plan(pipeline.STAGE_QUEUE_SIZE + pipeline.WRITER_CONCURRENCY + 4)
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    """Stub every agent called by the pipeline."""
+    async def write(prompt, context=""):
+        await asyncio.sleep(0)
+        return f"texte {prompt.split('Chapitre ')[1].split(':')[0]}"
+
+    async def moderate(texts, context):
+        return [{"coherent": True} for _ in texts]
+
+    async def paint(prompt, chapter_num):
+        return f"/static/images/chapter_{chapter_num}.png"
+
+    async def narrate(text, chapter_num):
+        return f"/static/audio/chapter_{chapter_num}.mp3"
+
+    monkeypatch.setattr(pipeline, "generate_chapter_content", write)
+    monkeypatch.setattr(pipeline, "verify_coherence_batch", moderate)
+    monkeypatch.setattr(pipeline, "generate_image", paint)
+    monkeypatch.setattr(pipeline, "generate_audio", narrate)
+
+
+class TestChapterPipeline:
+    """Test chapter generation through the stage pipeline."""
+
+    def test_chapters_in_plan_order(self, agents):
+        """Test that every chapter is generated with its own media."""
+        chapters = asyncio.run(run_chapter_pipeline(PLAN))
+        assert [c["numero"] for c in chapters] == [1, 2, 3, 4]
+        assert chapters[2]["contenu"] == "texte 3"
+        assert chapters[2]["image_path"] == "/static/images/chapter_3.png"
+        assert chapters[2]["audio_path"] == "/static/audio/chapter_3.mp3"
+
+    def test_rejection_stops_the_story(self, agents, monkeypatch):
+        """Test that a moderation rejection raises with the user message."""
+        async def reject(texts, context):
+            return [{"coherent": False, "user_message": "Contenu refusé"} for _ in texts]
+        monkeypatch.setattr(pipeline, "verify_coherence_batch", reject)
+
+        with pytest.raises(PipelineError, match="Contenu refusé"):
+            asyncio.run(run_chapter_pipeline(PLAN))
+
+    def test_writer_error_stops_the_story(self, agents, monkeypatch):
+        """Test that a writer failure raises PipelineError."""
+        async def fail(prompt, context=""):
+            raise RuntimeError("Writer Error: boom")
+        monkeypatch.setattr(pipeline, "generate_chapter_content", fail)
+
+        with pytest.raises(PipelineError, match="boom"):
+            asyncio.run(run_chapter_pipeline(PLAN))
+
+    def test_rejection_with_full_queue_does_not_hang(self, agents, monkeypatch):
+        """Test that a rejection stops the story while writers are blocked on the queue."""
+        async def reject(texts, context):
+            # Let the writers fill the queue first
+            await asyncio.sleep(0.01)
+            return [{"coherent": False, "user_message": "Contenu refusé"} for _ in texts]
+        monkeypatch.setattr(pipeline, "verify_coherence_batch", reject)
+
+        with pytest.raises(PipelineError, match="Contenu refusé"):
+            asyncio.run(asyncio.wait_for(run_chapter_pipeline(LONG_PLAN), 5))
+
+    def test_writer_error_cancels_other_chapters(self, agents, monkeypatch):
+        """Test that no chapter keeps being written after the story failed."""
+        started, finished = [], []
+        async def write(prompt, context=""):
+            number = int(prompt.split("Chapitre ")[1].split(":")[0])
+            started.append(number)
+            if number == 1:
+                raise RuntimeError("Writer Error: boom")
+            await asyncio.sleep(0.05)
+            finished.append(number)
+            return f"texte {number}"
+        monkeypatch.setattr(pipeline, "generate_chapter_content", write)
+
+        async def run():
+            with pytest.raises(PipelineError):
+                await run_chapter_pipeline(LONG_PLAN)
+            # Give orphaned writers the time to finish, if any were left running
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert finished == []
+        assert len(started) < len(LONG_PLAN["chapitres"])
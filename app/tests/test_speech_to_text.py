@@ -0,0 +1,64 @@
+"""
+Speech-to-Text Tests
+====================
+Tests for the optional ffmpeg transcode before transcription upload.
+"""
+import asyncio
+import os
+import pytest
+from app.agents.speech import speech_to_text
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    """A recording large enough to be transcoded."""
+    monkeypatch.setattr(speech_to_text, "TRANSCODE_MIN_BYTES", 0)
+    path = tmp_path / "voice.webm"
+    path.write_bytes(b"webm")
+    return path
+
+
+def fake_ffmpeg(tmp_path, monkeypatch, script: str):
+    """Put a stand-in ffmpeg executable on the lookup path."""
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(f"#!/bin/sh\n{script}\n")
+    ffmpeg.chmod(0o755)
+    monkeypatch.setattr(speech_to_text.shutil, "which", lambda name: str(ffmpeg))
+
+
+class TestTranscode:
+    """Test the transcode step and its fallbacks to the original file."""
+
+    def test_without_ffmpeg(self, recording, monkeypatch):
+        """Test that the original is uploaded when ffmpeg is not installed."""
+        monkeypatch.setattr(speech_to_text.shutil, "which", lambda name: None)
+        assert asyncio.run(speech_to_text._transcode_for_upload(str(recording))) is None
+
+    def test_hung_ffmpeg_times_out(self, recording, tmp_path, monkeypatch):
+        """Test that a hung ffmpeg is killed and the original uploaded."""
+        fake_ffmpeg(tmp_path, monkeypatch, "exec sleep 30")
+        monkeypatch.setattr(speech_to_text, "TRANSCODE_TIMEOUT_SECONDS", 0.2)
+        assert asyncio.run(speech_to_text._transcode_for_upload(str(recording))) is None
+
+    def test_failed_ffmpeg(self, recording, tmp_path, monkeypatch):
+        """Test that a failing ffmpeg leaves no output file behind."""
+        fake_ffmpeg(tmp_path, monkeypatch, f'out="$(eval echo \\${{$#}})"; echo "$out" > {tmp_path}/out; touch "$out"; exit 1')
+        assert asyncio.run(speech_to_text._transcode_for_upload(str(recording))) is None
+        output = (tmp_path / "out").read_text().strip()
+        assert not output.startswith(str(recording.parent))
+        assert not os.path.exists(output)
+
+    def test_cancelled_transcode(self, recording, tmp_path, monkeypatch):
+        """Test that a cancelled transcode reaps ffmpeg and removes its output."""
+        fake_ffmpeg(tmp_path, monkeypatch, f'out="$(eval echo \\${{$#}})"; echo "$out" > {tmp_path}/out; touch "$out"; exec sleep 30')
+
+        async def cancel():
+            task = asyncio.create_task(speech_to_text._transcode_for_upload(str(recording)))
+            while not (tmp_path / "out").exists():
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(asyncio.wait_for(cancel(), 5))
+        assert not os.path.exists((tmp_path / "out").read_text().strip())
@@ -60,18 +60,13 @@ def test_story_state_creation():
         "transcription": None,
         "keywords": ["fire", "fly"],
         "plan": None,
-        "current_chapter_index": 0,
         "generated_chapters": [],
-        "current_chapter_content": None,
-        "current_chapter_image": None,
-        "current_chapter_audio": None,
         "error": None,
         "retry_count": 0,
         "is_complete": False
     }
     
     assert state["user_input"]["age"] == 6
-    assert state["current_chapter_index"] == 0
     assert state["is_complete"] is False
     assert state["generated_chapters"] == []
 
@@ -94,11 +89,7 @@ def test_story_state_with_plan():
         "transcription": None,
         "keywords": None,
         "plan": plan,
-        "current_chapter_index": 0,
         "generated_chapters": [],
-        "current_chapter_content": None,
-        "current_chapter_image": None,
-        "current_chapter_audio": None,
         "error": None,
         "retry_count": 0,
         "is_complete": False
@@ -7,7 +7,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 from app.db.models import User, Story, Chapter, StoryStatus
-from app.agents.manager.manager import calculate_chapter_count
+from app.agents.manager.manager import calculate_chapter_count, _coerce_plan_numbers, _validate_plan
 
 
 class TestChapterCalculation:
@@ -45,6 +45,55 @@ class TestChapterCalculation:
             assert calculate_chapter_count(duration) == expected
 
 
+class TestPlanValidation:
+    """Test story plan structure validation."""
+    
+    def _plan(self):
+        return {
+            "plan": {"titre": "T", "age_cible": 6},
+            "morale": {},
+            "personnages": [{"nom": "Léa"}],
+            "elements_cles": {"peurs_evitees": []},
+            "chapitres": [{"numero": 1, "titre": "t", "resume": "r", "duree_minutes": 2}]
+        }
+    
+    def test_valid_plan(self):
+        """Test that a complete plan passes."""
+        _validate_plan(self._plan())
+    
+    def test_missing_plan_key(self):
+        """Test that a missing top-level key is reported."""
+        plan = self._plan()
+        del plan["morale"]
+        with pytest.raises(ValueError, match="morale"):
+            _validate_plan(plan)
+    
+    def test_missing_chapter_key(self):
+        """Test that a missing chapter key is reported."""
+        plan = self._plan()
+        del plan["chapitres"][0]["resume"]
+        with pytest.raises(ValueError, match="resume"):
+            _validate_plan(plan)
+    
+    def test_wrong_type(self):
+        """Test that a wrongly typed field is reported with its location."""
+        plan = self._plan()
+        plan["chapitres"][0]["duree_minutes"] = "deux"
+        with pytest.raises(ValueError, match="chapitres/0/duree_minutes"):
+            _validate_plan(plan)
+    
+    def test_numeric_strings_coerced(self):
+        """Test that numbers returned as strings are accepted."""
+        plan = self._plan()
+        plan["plan"]["age_cible"] = "6"
+        plan["chapitres"][0].update(numero="1", duree_minutes="1.5")
+        _coerce_plan_numbers(plan)
+        _validate_plan(plan)
+        assert plan["plan"]["age_cible"] == 6
+        assert plan["chapitres"][0]["numero"] == 1
+        assert plan["chapitres"][0]["duree_minutes"] == 1.5
+
+
 class TestStoryModel:
     """Test Story model operations."""
     
@@ -0,0 +1,84 @@
+"""
+Translator Tests
+================
+Tests for translator helpers (JSON parsing, language lookup).
+"""
+import asyncio
+import pytest
+from app.agents.translator import translator
+from app.agents.translator.translator import extract_json, parse_translation, get_language_name
+
+
+class TestExtractJson:
+    """Test JSON extraction from raw LLM responses."""
+
+    def test_plain_json(self):
+        """Test that a clean JSON response is parsed."""
+        assert extract_json('{"a": 1}') == {"a": 1}
+
+    def test_markdown_fences_and_prose(self):
+        """Test that fences and surrounding text are ignored."""
+        raw = 'Voici la traduction :\n```json\n{"a": {"b": "c"}}\n```\nBonne lecture !'
+        assert extract_json(raw) == {"a": {"b": "c"}}
+
+    def test_rtl_characters_are_stripped(self):
+        """Test that invisible RTL control characters are removed."""
+        raw = '‫{"title": "‏مرحبا"}‮'
+        assert extract_json(raw) == {"title": "مرحبا"}
+
+    def test_no_json(self):
+        """Test that a response without JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            extract_json("Je suis désolé, je ne peux pas.")
+
+    def test_none(self):
+        """Test that an empty response raises ValueError."""
+        with pytest.raises(ValueError):
+            extract_json(None)
+
+
+class TestParseTranslation:
+    """Test parsing of JSON-mode translation responses."""
+
+    def test_json_mode_response(self):
+        """Test that string fields are cleaned of RTL characters."""
+        raw = '{"chapter_header_translated": "\u202bالفصل 1", "chapter_content_translated": " نص\u200f "}'
+        assert parse_translation(raw) == {
+            "chapter_header_translated": "الفصل 1",
+            "chapter_content_translated": "نص",
+        }
+
+    def test_falls_back_to_extraction(self):
+        """Test that a fenced response is still parsed."""
+        assert parse_translation('```json\n{"a": "b"}\n```') == {"a": "b"}
+
+
+class TestLanguageName:
+    """Test language code lookup."""
+
+    def test_supported_language(self):
+        """Test that supported codes map to their full name."""
+        assert get_language_name("zh") == "Chinese"
+
+    def test_unknown_language(self):
+        """Test that unknown codes fall back to a title-cased code."""
+        assert get_language_name("xx") == "Xx"
+
+
+class TestTraduireChapitre:
+    """Test the translation request."""
+
+    def test_uses_hardened_context_and_wrapped_input(self, monkeypatch):
+        """Test that the context prompt is sent and the chapter is isolated in tags."""
+        sent = {}
+        async def complete(model, system, prompt, **params):
+            sent.update(system=system, prompt=prompt)
+            return '{"translated_title": "Chapter 1 – The Trip", "translated_content": "Once"}'
+        monkeypatch.setattr(translator, "_complete", complete)
+
+        result = asyncio.run(translator.traduire_chapitre(1, "Le <b>Voyage</b>", "Il était", "English"))
+        assert result == {"translated_title": "Chapter 1 – The Trip", "translated_content": "Once"}
+        assert sent["system"] == translator.SYSTEM_PROMPT
+        assert "<source_text>" in sent["prompt"]
+        assert "&lt;b&gt;Voyage" in sent["prompt"]
+        assert "<target_language>English</target_language>" in sent["prompt"]
@@ -153,8 +153,7 @@ async def upload_audio(
     # Save file
     try:
         content = await audio.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        await asyncio.to_thread(file_path.write_bytes, content)
         
         return {"audio_path": str(file_path), "filename": unique_filename}
     except Exception as e:
@@ -197,6 +196,42 @@ async def generate_story_api(
     
     return {"job_id": job_id, "status": "started"}
 
+def save_story(user_id: int, final_state: dict) -> tuple[int, str, int]:
+    """
+    Persist a generated story and its chapters (blocking DB I/O).
+    Returns (story_id, title, chapter_count).
+    """
+    from app.db.session import engine
+    with Session(engine) as session:
+        # Create Story record
+        db_story = Story(
+            user_id=user_id,
+            title=final_state["plan"]["plan"]["titre"],
+            plan_data=final_state["plan"],
+            status=StoryStatus.COMPLETED
+        )
+        session.add(db_story)
+        session.commit()
+        session.refresh(db_story)
+        
+        # Create Chapter records
+        chapter_count = len(final_state["generated_chapters"])
+        for chapter_data in final_state["generated_chapters"]:
+            db_chapter = Chapter(
+                story_id=db_story.id,
+                chapter_number=chapter_data["numero"],
+                title=chapter_data["titre"],
+                summary_prompt=chapter_data["resume"],
+                text_content=chapter_data.get("contenu"),
+                image_url=chapter_data.get("image_path"),
+                audio_url=chapter_data.get("audio_path"),
+                status=ChapterStatus.COMPLETED
+            )
+            session.add(db_chapter)
+        
+        session.commit()
+        return db_story.id, db_story.title, chapter_count
+
 async def run_story_generation(job_id: str, initial_state: dict, user_id: int):
     story_id = None
     logger.info(f"Starting story generation job {job_id} for user {user_id}")
@@ -221,54 +256,25 @@ async def run_story_generation(job_id: str, initial_state: dict, user_id: int):
             carbon_tracker.stop()  # Still track failed attempts
             return
         
-        # Save to database
-        from app.db.session import engine
-        with Session(engine) as session:
-            # Create Story record
-            db_story = Story(
-                user_id=user_id,
-                title=final_state["plan"]["plan"]["titre"],
-                plan_data=final_state["plan"],
-                status=StoryStatus.COMPLETED
-            )
-            session.add(db_story)
-            session.commit()
-            session.refresh(db_story)
-            story_id = db_story.id
-            
-            # Create Chapter records
-            chapter_count = len(final_state["generated_chapters"])
-            for chapter_data in final_state["generated_chapters"]:
-                db_chapter = Chapter(
-                    story_id=db_story.id,
-                    chapter_number=chapter_data["numero"],
-                    title=chapter_data["titre"],
-                    summary_prompt=chapter_data["resume"],
-                    text_content=chapter_data.get("contenu"),
-                    image_url=chapter_data.get("image_path"),
-                    audio_url=chapter_data.get("audio_path"),
-                    status=ChapterStatus.COMPLETED
-                )
-                session.add(db_chapter)
-            
-            session.commit()
-            
-            # Update job status with story_id
-            story_jobs[job_id]["status"] = "completed"
-            story_jobs[job_id]["result"] = final_state
-            story_jobs[job_id]["story_id"] = db_story.id
-            
-            # Log successful story creation
-            log_story_event(
-                user_id=user_id,
-                story_id=db_story.id,
-                event="story_created",
-                details={
-                    "job_id": job_id,
-                    "title": db_story.title,
-                    "chapter_count": chapter_count
-                }
-            )
+        # Save to database off the event loop
+        story_id, title, chapter_count = await asyncio.to_thread(save_story, user_id, final_state)
+        
+        # Update job status with story_id
+        story_jobs[job_id]["status"] = "completed"
+        story_jobs[job_id]["result"] = final_state
+        story_jobs[job_id]["story_id"] = story_id
+        
+        # Log successful story creation
+        log_story_event(
+            user_id=user_id,
+            story_id=story_id,
+            event="story_created",
+            details={
+                "job_id": job_id,
+                "title": title,
+                "chapter_count": chapter_count
+            }
+        )
         
         # Stop carbon tracking and update with story_id
         carbon_tracker.story_id = story_id
@@ -489,17 +495,29 @@ async def translate_story_task(story_id: int, lang: str, user_id: int):
             ).all()
             
             language_name = get_language_name(lang)
-            
-            for chapter in chapters:
-                try:
-                    # Translate chapter
-                    translation = traduire_chapitre(
+
+            # Translate all chapters concurrently, bounded to respect provider rate limits
+            semaphore = asyncio.Semaphore(settings.TRANSLATION_CONCURRENCY)
+
+            async def translate(chapter: Chapter):
+                async with semaphore:
+                    return await traduire_chapitre(
                         chapter_number=chapter.chapter_number,
                         title=chapter.title,
                         content=chapter.text_content or "",
                         langue_cible=language_name
                     )
-                    
+
+            translations = await asyncio.gather(
+                *(translate(chapter) for chapter in chapters),
+                return_exceptions=True
+            )
+
+            for chapter, translation in zip(chapters, translations):
+                try:
+                    if isinstance(translation, Exception):
+                        raise translation
+
                     # Update translations field - create new dict to trigger change detection
                     if not chapter.translations:
                         chapter.translations = {}
@@ -596,7 +614,7 @@ async def generate_chapter_audio(
         try:
             # Generate French audio from original content
             from app.agents.speech.text_to_speech import generate_audio
-            audio_url = generate_audio(chapter.text_content, chapter.chapter_number, "fr")
+            audio_url = await generate_audio(chapter.text_content, chapter.chapter_number, "fr")
             
             if audio_url:
                 chapter.audio_url = audio_url
@@ -643,7 +661,7 @@ async def generate_chapter_audio(
     
     try:
         # Generate audio for translated content
-        audio_url = generate_audio_for_translation(translated_text, chapter_id, lang)
+        audio_url = await generate_audio_for_translation(translated_text, chapter_id, lang)
         
         if audio_url:
             # Save audio URL